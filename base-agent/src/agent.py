@@ -3,21 +3,230 @@ Agent - Core agent class with reasoning loop and memory.
 """
 
 import os
+import json
+import time
+import asyncio
+import contextlib
+import functools
 from typing import TypedDict, Annotated, Optional, Dict, Any, List
 from pathlib import Path
 
+import httpx
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph.message import add_messages
 
 from tools import get_tools
 from reasoning.tool_context import build_tool_guide
-from reasoning import get_global_registry, create_react_graph
+from reasoning import get_global_registry, get_compiled_graph, create_react_graph
+
+# Prefer uvloop for astream() when available; falls back to the default loop
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+# Streamed content is coalesced until this many chars or seconds accumulate.
+# The interval is only checked as chunks arrive, so the stream loops also
+# flush on every non-content event (tool calls) and node change.
+_FLUSH_CHARS = 64
+_FLUSH_INTERVAL = 0.02
+
+
+class _ChunkBuffer:
+    """Coalesce small streamed chunks so consumers see fewer, larger yields."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, text: str) -> Optional[str]:
+        """Buffer text and return the joined buffer once it is due to flush."""
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= _FLUSH_CHARS or time.monotonic() - self._last_flush > _FLUSH_INTERVAL:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return and clear any buffered text."""
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        self._last_flush = time.monotonic()
+        return text
+
+
+# Prompts submitted within this window are answered by one batched LLM call
+_MAX_BATCH = 8
+_BATCH_WINDOW_MS = 20
+
+
+class _BatchScheduler:
+    """
+    Coalesce concurrent prompts into a single chat completion.
+
+    Only first turns are batched: they share the same prompt prefix (system
+    prompt, plus the tool guide if the strategy wants it), which is sent once
+    for the whole batch, and the model answers every item as one JSON list.
+    A future resolves to None when its prompt should run through the full
+    graph instead (it arrived alone, the model wants tools, the reply
+    couldn't be split, or the batch failed).
+    """
+
+    def __init__(self, agent: "Agent", max_batch: int = _MAX_BATCH, window_ms: int = _BATCH_WINDOW_MS):
+        self.agent = agent
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # thread_id -> set when the turn holding that thread has finished
+        self._busy_threads: Dict[str, asyncio.Event] = {}
+
+    @contextlib.asynccontextmanager
+    async def thread_turn(self, thread_id: str):
+        """
+        Hold a thread for one turn, yielding whether it is still empty.
+
+        Turns on the same thread run one at a time, so two concurrent first
+        turns can't both see an empty thread and both write the prefix.
+        """
+        while thread_id in self._busy_threads:
+            await self._busy_threads[thread_id].wait()
+        done = self._busy_threads[thread_id] = asyncio.Event()
+        try:
+            snapshot = await self.agent.graph.aget_state(self.agent._thread_config(thread_id))
+            yield not snapshot.values.get("messages")
+        finally:
+            del self._busy_threads[thread_id]
+            done.set()
+
+    async def submit(self, user_input: str) -> Optional[str]:
+        """Queue a first-turn prompt and wait for its answer (None means not batched)."""
+        loop = asyncio.get_running_loop()
+        # The queue and worker belong to one event loop; recreate on a new one
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        await self._queue.put((user_input, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._dispatch(batch)
+            except Exception:
+                # Never leave callers waiting; they fall back to the graph
+                _resolve([future for _, future in batch], [None] * len(batch))
+
+    async def _dispatch(self, batch: list):
+        futures = [future for _, future in batch]
+        if len(batch) == 1:
+            _resolve(futures, [None])
+            return
+
+        items = "\n".join(f"{i}) {user_input}" for i, (user_input, _) in enumerate(batch, start=1))
+        messages = self.agent._prompt_prefix() + [
+            HumanMessage(content=(
+                "Answer each item independently. Return only a JSON list of "
+                f"{len(batch)} strings, one answer per item, in order.\n{items}"
+            )),
+        ]
+
+        response = await self.agent.llm_with_tools.ainvoke(messages)
+
+        answers = None
+        if not getattr(response, "tool_calls", None):
+            answers = _parse_batch_answers(response.content, len(batch))
+        _resolve(futures, answers or [None] * len(batch))
+
+
+def _parse_batch_answers(content: str, expected: int) -> Optional[List[str]]:
+    """Parse a batched reply into exactly `expected` answers, or None."""
+    # Content can also be a list of content blocks; don't try to split those
+    if not isinstance(content, str):
+        return None
+    text = content.strip()
+    # Models often wrap JSON in a code fence despite being asked not to
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    try:
+        answers = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(answers, list) or len(answers) != expected:
+        return None
+    return [str(a) for a in answers]
+
+
+def _resolve(futures: list, results: list):
+    for future, result in zip(futures, results):
+        if not future.done():
+            future.set_result(result)
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_http_client() -> httpx.Client:
+    """Process-wide HTTP client so all agents share one connection pool."""
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_chat_openai(model: str, temperature: float, streaming: bool) -> ChatOpenAI:
+    """Get a ChatOpenAI instance shared by every agent with the same settings."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        streaming=streaming,
+        http_client=_shared_http_client(),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load_prompt_cached(abs_path: str) -> str:
+    """Read a prompt file once per process, keyed by absolute path."""
+    prompt_path = Path(abs_path)
+
+    if prompt_path.exists():
+        return prompt_path.read_text().strip()
+
+    return "You are a helpful AI assistant."
+
+
+def _add_messages_fast(left: list, right: list) -> list:
+    """add_messages reducer that skips the merge for empty updates."""
+    # Several strategy nodes return {"messages": []}; add_messages would still
+    # convert and re-index the whole history just to return it unchanged
+    if not right:
+        return left
+    return add_messages(left, right)
 
 
 class AgentState(TypedDict):
     """State that tracks conversation messages and optional planning state."""
-    messages: Annotated[list[BaseMessage], add_messages]
+    messages: Annotated[list[BaseMessage], _add_messages_fast]
     # Optional planning state used by some strategies (ReWOO / Plan-Execute)
     plan: Optional[Dict[str, Any]]  # Strategy-specific plan structure
     step_idx: Optional[int]         # Current step index for sequential execution
@@ -44,12 +253,11 @@ class Agent:
         # Initialize tools after env is loaded
         self.tools = tools or get_tools()
 
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            model=self.model_name,
-            temperature=self.temperature,
-            streaming=True
-        )
+        # Prompt prefix messages are static per tool set, so build them once
+        self._invalidate_prompt_cache()
+
+        # Initialize LLM (shared across agents with the same settings)
+        self.llm = _shared_chat_openai(self.model_name, self.temperature, True)
 
         # Bind tools to LLM
         # This tells the LLM about available tools and their descriptions
@@ -61,28 +269,64 @@ class Agent:
         # Set initial reasoning strategy
         if reasoning_strategy:
             self.strategy_registry.set_current_strategy(reasoning_strategy)
+        # Handle to the active strategy; refreshed only when switching
+        self._current_strategy = self.strategy_registry.get_current_strategy()
+
+        # Conversation history for this agent's threads. Compiled graphs are
+        # shared between agents, so each agent attaches its own checkpointer
+        # and its threads are freed along with it.
+        self._checkpointer = MemorySaver()
 
         # Build the reasoning graph using current strategy
         self.graph = self._build_graph()
 
+        # Micro-batcher for stream_batched(); idle until first used
+        self._batcher = _BatchScheduler(self)
+
     def _load_system_prompt(self, path: str) -> str:
         """Load system prompt from file."""
-        prompt_path = Path(__file__).parent / path
-
-        if prompt_path.exists():
-            return prompt_path.read_text().strip()
+        prompt_path = (Path(__file__).parent / path).resolve()
+        return _load_prompt_cached(prompt_path.as_posix())
 
-        return "You are a helpful AI assistant."
+    def _invalidate_prompt_cache(self):
+        """Rebuild the cached system and tool-guide messages sent each turn."""
+        self._system_msg = SystemMessage(content=self.system_prompt)
+        self._tool_guide_msg = SystemMessage(content=build_tool_guide(self.tools))
 
     def _build_graph(self):
-        """Build the reasoning graph using the current strategy."""
-        strategy = self.strategy_registry.get_current_strategy()
-        return strategy.create_graph(AgentState, self.llm_with_tools, self.tools)
+        """Build (or reuse) the reasoning graph for the current strategy."""
+        # Graphs are shared process-wide by (strategy, LLM, tools) identity, so
+        # switching back to a strategy or creating another agent doesn't
+        # recompile; the copy only swaps in this agent's checkpointer
+        graph = get_compiled_graph(
+            self._current_strategy, AgentState, self.llm, self.llm_with_tools, self.tools
+        )
+        return graph.copy(update={"checkpointer": self._checkpointer})
+
+    def set_tools(self, tools: list):
+        """
+        Replace the agent's tool set.
+
+        Rebinds the tools to the LLM and switches to a graph compiled for
+        the new tool set. Conversation history is reset, since it carries
+        the old tool guide.
+
+        Args:
+            tools: New list of tool instances
+        """
+        self.tools = tools
+        self.llm_with_tools = self.llm.bind_tools(self.tools)
+        self._invalidate_prompt_cache()
+        self._checkpointer = MemorySaver()
+        self.graph = self._build_graph()
 
     def switch_reasoning_strategy(self, strategy_name: str):
         """
         Switch to a different reasoning strategy.
 
+        Conversation history is reset, so switching back to a strategy does
+        not bring back the history it had before.
+
         Args:
             strategy_name: Name of the strategy to switch to (e.g., 'react', 'rewoo', 'plan-execute', 'lats')
 
@@ -90,7 +334,10 @@ class Agent:
             KeyError: If strategy doesn't exist
         """
         self.strategy_registry.set_current_strategy(strategy_name)
-        # Rebuild the graph with the new strategy
+        self._current_strategy = self.strategy_registry.get_current_strategy()
+        # Start from a fresh history, as a newly compiled graph would
+        self._checkpointer = MemorySaver()
+        # Rebuild the graph with the new strategy (cached after first use)
         self.graph = self._build_graph()
 
     def get_current_strategy_name(self) -> str:
@@ -115,6 +362,81 @@ class Agent:
             strategy_name = self.get_current_strategy_name()
         return self.strategy_registry.get_strategy_info(strategy_name)
 
+    def _init_thread(self, config: dict) -> List[BaseMessage]:
+        """
+        Get the prefix messages to send for a thread.
+
+        The system prompt and tool guide are injected only on a thread's first
+        turn; after that they live in the checkpointed history, which keeps
+        the prompt prefix token-identical across turns.
+        """
+        snapshot = self.graph.get_state(config)
+        if snapshot.values.get("messages"):
+            return []
+        return self._prompt_prefix()
+
+    def _prompt_prefix(self) -> List[BaseMessage]:
+        """Get the prefix messages that open a new thread."""
+        # Keep the prefix order stable (system prompt, then tool guide) so
+        # every token before the human message forms a cacheable prefix.
+        if not self._current_strategy.needs_tool_guide():
+            # Strategy carries the guide in its own planning prompt
+            return [self._system_msg]
+        return [
+            self._system_msg,
+            # Inject shared tool guide so all strategies see the same context
+            self._tool_guide_msg,
+        ]
+
+    def _thread_config(self, thread_id: str) -> dict:
+        """Get the graph config for one of this agent's threads."""
+        return {
+            "configurable": {
+                "thread_id": thread_id
+            }
+        }
+
+    def _prepare_stream(self, user_input: str, thread_id: str):
+        """Build the input state and config for a streamed graph run."""
+        config = self._thread_config(thread_id)
+
+        input_state = {
+            "messages": self._init_thread(config) + [HumanMessage(content=user_input)]
+        }
+
+        return input_state, config
+
+    def _trace_header(self) -> str:
+        """Get the strategy trace line shown when show_trace is enabled."""
+        trace_info = self._current_strategy.get_trace_info()
+        return f"[TRACE: {trace_info.get('strategy', 'unknown').upper()}]\n"
+
+    def _chunk_content(self, message, metadata, trace_nodes) -> Optional[str]:
+        """Extract displayable content from a streamed message event, if any."""
+        # Dispatch on the cheap .type tag rather than isinstance: token deltas
+        # arrive as "AIMessageChunk", node-created messages as "ai"
+        message_type = message.type
+
+        if message_type == "AIMessageChunk":
+            # Trace nodes re-emit their LLM output wrapped in a marker message,
+            # so their raw tokens would otherwise show up twice
+            if metadata.get("langgraph_node") in trace_nodes:
+                return None
+            return message.content or None
+
+        if message_type == "ai":
+            # Tool calls are already logged by tool_logger, no need to show [TOOL: xxx].
+            # Trace messages ([PLAN CREATED], [REFLECTION], ...) are shown as-is,
+            # so any non-empty content is yielded without scanning for markers.
+            return message.content or None
+
+        # Show tool results
+        elif message_type == "tool":
+            # Don't display tool output, just let it feed back to agent
+            pass
+
+        return None
+
     def stream(self, user_input: str, thread_id: str = "default", show_trace: bool = False):
         """
         Stream response for user input.
@@ -124,50 +446,104 @@ class Agent:
             thread_id: Session thread identifier
             show_trace: Whether to show reasoning trace information
         """
-        from langchain_core.messages import ToolMessage
+        input_state, config = self._prepare_stream(user_input, thread_id)
 
-        # Prepend system message to the user input
-        input_state = {
-            "messages": [
-                SystemMessage(content=self.system_prompt),
-                # Inject shared tool guide so all strategies see the same context
-                SystemMessage(content=build_tool_guide(self.tools)),
-                HumanMessage(content=user_input),
-            ]
-        }
+        # Get strategy trace info if requested
+        if show_trace:
+            yield self._trace_header()
+
+        # Stream token deltas rather than full state snapshots
+        trace_nodes = self._current_strategy.get_trace_nodes()
+        buffer = _ChunkBuffer()
+        last_node = None
+        for message, metadata in self.graph.stream(input_state, config, stream_mode="messages"):
+            content = self._chunk_content(message, metadata, trace_nodes)
+            node = metadata.get("langgraph_node")
+            if not content or node != last_node:
+                # A tool call or node change can take seconds before the next
+                # token; don't hold buffered text back across it
+                last_node = node
+                pending = buffer.flush()
+                if pending:
+                    yield pending
+            if content:
+                ready = buffer.add(content)
+                if ready:
+                    yield ready
+
+        remainder = buffer.flush()
+        if remainder:
+            yield remainder
+
+    async def astream(self, user_input: str, thread_id: str = "default", show_trace: bool = False):
+        """
+        Asynchronously stream response for user input.
 
-        config = {
-            "configurable": {
-                "thread_id": thread_id
-            }
-        }
+        Same output as stream(), for async callers such as stream_batched():
+        it awaits the graph's async API instead of blocking the event loop.
+        Tool calls are executed the same way as under stream().
+
+        Args:
+            user_input: The user's query
+            thread_id: Session thread identifier
+            show_trace: Whether to show reasoning trace information
+        """
+        input_state, config = self._prepare_stream(user_input, thread_id)
 
         # Get strategy trace info if requested
         if show_trace:
-            strategy = self.strategy_registry.get_current_strategy()
-            trace_info = strategy.get_trace_info()
-            yield f"[TRACE: {trace_info.get('strategy', 'unknown').upper()}]\n"
-
-        # Stream and yield AI message content
-        for chunk in self.graph.stream(input_state, config, stream_mode="values"):
-            if "messages" in chunk and chunk["messages"]:
-                last_message = chunk["messages"][-1]
-
-                # Check for tool calls in AI messages
-                if isinstance(last_message, AIMessage):
-                    # Tool calls are already logged by tool_logger, no need to show [TOOL: xxx]
-
-                    # Show strategy-specific markers for LATS and Plan-Execute
-                    if last_message.content:
-                        content = last_message.content
-                        # Show trace markers for special reasoning steps
-                        if "[CANDIDATES GENERATED]" in content or "[PLAN CREATED]" in content or "[REFLECTION]" in content:
-                            yield content
-                        # Only yield if there's actual content (not just tool calls)
-                        elif content:
-                            yield content
-
-                # Show tool results
-                elif isinstance(last_message, ToolMessage):
-                    # Don't display tool output, just let it feed back to agent
-                    pass
+            yield self._trace_header()
+
+        # Stream token deltas rather than full state snapshots
+        trace_nodes = self._current_strategy.get_trace_nodes()
+        buffer = _ChunkBuffer()
+        last_node = None
+        async for message, metadata in self.graph.astream(input_state, config, stream_mode="messages"):
+            content = self._chunk_content(message, metadata, trace_nodes)
+            node = metadata.get("langgraph_node")
+            if not content or node != last_node:
+                last_node = node
+                pending = buffer.flush()
+                if pending:
+                    yield pending
+            if content:
+                ready = buffer.add(content)
+                if ready:
+                    yield ready
+
+        remainder = buffer.flush()
+        if remainder:
+            yield remainder
+
+    async def stream_batched(self, user_input: str, thread_id: str = "default", show_trace: bool = False):
+        """
+        Stream a response, batching with other concurrent callers when possible.
+
+        First turns submitted within a short window share one LLM call and
+        one copy of the prompt prefix. Batched answers are yielded whole and
+        written to the thread's history like a graph turn would be; follow-up
+        turns, and prompts that arrive alone or need tools, run through
+        astream() as usual. Turns on the same thread run one at a time.
+
+        Args:
+            user_input: The user's query
+            thread_id: Session thread identifier
+            show_trace: Whether to show reasoning trace information
+        """
+        async with self._batcher.thread_turn(thread_id) as first_turn:
+            answer = await self._batcher.submit(user_input) if first_turn else None
+            if answer is None:
+                async for chunk in self.astream(user_input, thread_id, show_trace):
+                    yield chunk
+                return
+
+            # Record the exchange so the next turn on this thread sees it. The
+            # thread was empty when batched, so the update applies as graph input.
+            await self.graph.aupdate_state(
+                self._thread_config(thread_id),
+                {"messages": self._prompt_prefix() + [HumanMessage(content=user_input), AIMessage(content=answer)]},
+            )
+
+        if show_trace:
+            yield self._trace_header()
+        yield answer
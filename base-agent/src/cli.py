@@ -21,32 +21,75 @@ Commands:
 
 from __future__ import annotations
 
+import io
 import os
+import re
+import signal
 import sys
-from typing import List, Tuple, Callable, Dict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import List, Optional, Tuple, Callable, Dict, Iterator
 from dataclasses import dataclass
 import shutil
 
 from rich.console import Console
-from rich.markdown import Markdown
+from rich.live import Live
 from rich.panel import Panel
 from rich.spinner import SPINNERS
 
-from prompt_toolkit.shortcuts import PromptSession
-from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.styles import Style
-from prompt_toolkit.completion import NestedCompleter, PathCompleter, FuzzyCompleter
-from prompt_toolkit.patch_stdout import patch_stdout
-from prompt_toolkit.filters import Condition
-from prompt_toolkit.application.current import get_app
+# prompt_toolkit is imported inside run_interactive(): one-shot mode never
+# needs it, and it is a large import on startup
 
 console = Console()
 
+# Terminal width for the response rules. A SIGWINCH handler keeps it current
+# while a response streams, so the rule after the response needs no query of
+# its own. prompt() leaves SIGWINCH at its default disposition, so
+# run_interactive re-installs the handler (and refreshes) once per turn.
+_term_cols = [shutil.get_terminal_size(fallback=(80, 20)).columns]
+
+
+def _refresh_term_cols(*_) -> None:
+    _term_cols[0] = shutil.get_terminal_size(fallback=(80, 20)).columns
+
+
+def _track_term_cols() -> None:
+    """Refresh the cached width and (re)install its SIGWINCH handler."""
+    _refresh_term_cols()
+    if hasattr(signal, "SIGWINCH"):
+        signal.signal(signal.SIGWINCH, _refresh_term_cols)
+
+
+@lru_cache(maxsize=8)
+def _rule_for_width(width: int) -> str:
+    return "[dim]" + "-" * min(width, 120) + "[/dim]"
+
+
+def _rule() -> str:
+    return _rule_for_width(_term_cols[0])
+
 
 # ============================================================================
 # Command Dispatcher
 # ============================================================================
 
+_EXIT_COMMANDS = frozenset({"quit", "q", "exit", "/quit", "/exit"})
+_EXIT_MAX_LEN = max(map(len, _EXIT_COMMANDS))
+_HELP_COMMANDS = frozenset({"/help", "/?"})
+_CMD_RE = re.compile(r"/(\S+)")
+
+# Printed as one block (leading and trailing blank line) in a single write
+_HELP_TEXT = "\n".join([
+    "",
+    "[#888888]/file PATH[/#888888] — attach a local file",
+    "[#888888]/tools[/#888888] — list available tools",
+    "[#888888]/reasoning[/#888888] — list or switch strategy",
+    "[#888888]/help[/#888888] — show available commands",
+    "[#888888]/quit[/#888888] — exit application",
+    "",
+])
+
+
 @dataclass
 class CommandResult:
     """Result from command execution."""
@@ -76,35 +119,26 @@ class CommandDispatcher:
         if not text:
             return CommandResult(handled=True, should_exit=False)
 
-        if text.lower() in {"quit", "q", "exit", "/quit", "/exit"}:
+        # Length check first so long pasted prompts aren't lowercased
+        if len(text) <= _EXIT_MAX_LEN and text.lower() in _EXIT_COMMANDS:
             return self._handle_quit(text, [])
 
-        if text in {"/help", "/?"}:
+        if text in _HELP_COMMANDS:
             return self._handle_help(text, [])
 
-        if text.startswith("/"):
-            parts = text[1:].split()
-            if not parts:
-                return CommandResult(handled=False, should_process=True, message=text)
-
-            command = parts[0].lower()
-            args = parts[1:]
-
-            handler = self.commands.get(command)
+        # Only the command word is needed to route; the rest of the text (which
+        # may be a large pasted prompt after /file) is split for handlers only
+        match = _CMD_RE.match(text)
+        if match:
+            handler = self.commands.get(match.group(1).lower())
             if handler:
-                return handler(text, args)
+                return handler(text, text[match.end():].split())
 
         return CommandResult(handled=False, should_process=True, message=text)
 
     def _handle_help(self, text: str, args: List[str]) -> CommandResult:
         """Handle /help command."""
-        console.print()
-        console.print("[#888888]/file PATH[/#888888] — attach a local file")
-        console.print("[#888888]/tools[/#888888] — list available tools")
-        console.print("[#888888]/reasoning[/#888888] — list or switch strategy")
-        console.print("[#888888]/help[/#888888] — show available commands")
-        console.print("[#888888]/quit[/#888888] — exit application")
-        console.print()
+        console.print(_HELP_TEXT)
         return CommandResult(handled=True, should_exit=False)
 
     def _handle_quit(self, text: str, args: List[str]) -> CommandResult:
@@ -182,6 +216,7 @@ class CommandDispatcher:
         new_strategy = args[0].lower()
         try:
             self.agent.switch_reasoning_strategy(new_strategy)
+            _STRATEGY_CACHE["name"] = None
             console.print(f"\n[green]✓[/green] Switched to [bold]{new_strategy}[/bold] strategy\n")
             display_banner(self.agent)
         except KeyError as e:
@@ -209,32 +244,19 @@ class CommandDispatcher:
 
     def get_completions(self) -> Dict:
         """Get command completions for prompt_toolkit."""
-        return {
-            "/file": PathCompleter(expanduser=True, only_directories=False),
-            "/tools": None,
-            "/help": None,
-            "/reasoning": {
-                "list": None,
-                "current": None,
-                "switch": {"react": None, "rewoo": None, "plan-execute": None, "lats": None},
-                "info": {"react": None, "rewoo": None, "plan-execute": None, "lats": None},
-            },
-            "/quit": None,
-            "/exit": None,
-        }
+        return _completions()
 
 
 # ============================================================================
 # Display Functions
 # ============================================================================
 
-def display_banner(agent) -> None:
-    """Display startup banner with agent info."""
-    model = agent.model_name
-    strategy = agent.get_current_strategy_name()
-    strategy_info = agent.get_strategy_info(strategy)
-    desc = strategy_info['description'].split('.')[0]
+_RICH_TAG_RE = re.compile(r"\[[^\]]*\]")
 
+
+@lru_cache(maxsize=8)
+def _banner_panel(model: str, strategy: str, desc: str, cwd: str) -> Panel:
+    """Build the banner panel; reused while model, strategy and cwd are unchanged."""
     content = (
         f"[dim]agent:[/dim] Base Agent\n"
         f"[dim]model:[/dim] {model}\n"
@@ -243,44 +265,105 @@ def display_banner(agent) -> None:
         f"  - internet search (DuckDuckGo)\n"
         f"  - web fetch (HTTP/HTTPS)\n"
         f"  - command line (shell)\n"
-        f"[dim]directory:[/dim] {os.getcwd()}"
+        f"[dim]directory:[/dim] {cwd}"
     )
 
     # Calculate panel width based on content
-    visible_text = content.replace("[dim]", "").replace("[/dim]", "")
+    visible_text = _RICH_TAG_RE.sub("", content)
     max_line = max(len(line) for line in visible_text.splitlines())
     width = min(max(max_line + 4, 70), 120)
 
-    panel = Panel(content, border_style="dim", width=width)
+    return Panel(content, border_style="dim", width=width)
+
+
+def display_banner(agent) -> None:
+    """Display startup banner with agent info."""
+    strategy = agent.get_current_strategy_name()
+    strategy_info = agent.get_strategy_info(strategy)
+    desc = strategy_info['description'].split('.')[0]
+
+    panel = _banner_panel(agent.model_name, strategy, desc, os.getcwd())
     console.print()
     console.print(panel)
 
 
-def stream_response(agent, prompt: str, session_id: str) -> None:
-    """Stream response from agent (plain text output)."""
-    accumulated = ""
-    strategy = agent.get_current_strategy_name()
-    status = f"[blue][{strategy.upper()}] Thinking...[/blue]"
+# Spinner text for the active strategy; reset by /reasoning switch
+_STRATEGY_CACHE: Dict[str, Optional[str]] = {"name": None, "status": ""}
+
 
-    # Pick a spinner
-    spinner_name = "dots"
-    for name in ("squareCorners", "dots9", "dots12", "dots"):
+def _strategy_status(agent) -> str:
+    """Get the cached "[STRATEGY] Thinking..." status line."""
+    if _STRATEGY_CACHE["name"] is None:
+        name = agent.get_current_strategy_name()
+        _STRATEGY_CACHE.update(name=name, status=f"[blue][{name.upper()}] Thinking...[/blue]")
+    return _STRATEGY_CACHE["status"]
+
+
+@lru_cache(maxsize=1)
+def _pick_spinner_name() -> str:
+    """First preferred spinner this rich version ships (SPINNERS is static)."""
+    for name in ("squareCorners", "dots9", "dots12"):
         if name in SPINNERS:
-            spinner_name = name
-            break
+            return name
+    return "dots"
 
-    with console.status(status, spinner=spinner_name, spinner_style="dim"):
-        try:
-            for chunk in agent.stream(prompt, session_id):
+
+class _JoinedText:
+    """Renderable over a growing list of chunks, joined only when painted."""
+
+    def __init__(self, parts: List[str]):
+        self.parts = parts
+
+    def __rich__(self) -> str:
+        return "".join(self.parts)
+
+
+def stream_response(agent, prompt: str, session_id: str) -> None:
+    """Stream response from agent (plain text output)."""
+    parts: List[str] = []
+    status_text = _strategy_status(agent)
+
+    # Piped or redirected output gets no spinner and no refresh threads; Live
+    # would only print its final render there anyway
+    interactive = console.is_terminal
+    status = (
+        console.status(status_text, spinner=_pick_spinner_name(), spinner_style="dim")
+        if interactive else nullcontext()
+    )
+
+    chunks = iter(agent.stream(prompt, session_id))
+    try:
+        # Phase 1: spin until the first visible chunk arrives
+        with status:
+            for chunk in chunks:
                 if chunk:
-                    accumulated += chunk
-        except Exception as e:
-            console.print(f"[red]Error: {e}[/red]")
+                    parts.append(chunk)
+                    if chunk.strip():
+                        break
+
+        if not "".join(parts).strip():
+            console.print()
             return
 
-    if accumulated.strip():
-        # Print as plain text instead of markdown
-        console.print(accumulated)
+        if not interactive:
+            parts.extend(chunks)
+            console.print(_JoinedText(parts))
+        else:
+            # Phase 2: the loop only appends; Live's refresh thread joins and
+            # paints at its own 10 Hz cadence, decoupled from chunk arrival.
+            # The view is transient and cropped to the screen, so a reply
+            # taller than the terminal is not redrawn into the scrollback;
+            # the full text is printed once when streaming ends.
+            try:
+                with Live(_JoinedText(parts), console=console, refresh_per_second=10, transient=True):
+                    for chunk in chunks:
+                        parts.append(chunk)
+            finally:
+                console.print(_JoinedText(parts))
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        return
+
     console.print()
 
 
@@ -288,38 +371,42 @@ def stream_response(agent, prompt: str, session_id: str) -> None:
 # File Attachment Helpers
 # ============================================================================
 
+# Runs shorter than three never affect the fence, so don't match them at all
+_BACKTICK_RUN_RE = re.compile(r"`{3,}")
+
+
 def _max_backtick_run(s: str) -> int:
-    """Find the longest consecutive run of backticks in a string."""
-    max_run = run = 0
-    for ch in s:
-        if ch == "`":
-            run += 1
-            max_run = max(max_run, run)
-        else:
-            run = 0
-    return max_run
+    """Find the longest run of three or more backticks in a string (0 if none)."""
+    return max(map(len, _BACKTICK_RUN_RE.findall(s)), default=0)
 
 
 def _choose_fence(content: str) -> str:
     """Choose a backtick fence longer than any backtick run in content."""
+    # Almost no file has a run of 3+ backticks, so skip the full scan
+    if "```" not in content:
+        return "```"
     return "`" * max(3, _max_backtick_run(content) + 1)
 
 
+_EXT_LANG: Dict[str, str] = {
+    ".py": "python", ".js": "javascript", ".ts": "typescript",
+    ".sh": "bash", ".bash": "bash", ".json": "json",
+    ".yaml": "yaml", ".yml": "yaml", ".md": "markdown",
+    ".txt": "text", ".go": "go", ".rs": "rust",
+    ".java": "java", ".c": "c", ".cpp": "cpp",
+    ".toml": "toml", ".ini": "ini",
+}
+
+
+@lru_cache(maxsize=256)
 def _language_from_filename(path: str) -> str:
     """Detect language from file extension."""
     name = os.path.basename(path).lower()
     if name == "dockerfile":
         return "dockerfile"
-    ext = os.path.splitext(name)[1]
-    langs = {
-        ".py": "python", ".js": "javascript", ".ts": "typescript",
-        ".sh": "bash", ".bash": "bash", ".json": "json",
-        ".yaml": "yaml", ".yml": "yaml", ".md": "markdown",
-        ".txt": "text", ".go": "go", ".rs": "rust",
-        ".java": "java", ".c": "c", ".cpp": "cpp",
-        ".toml": "toml", ".ini": "ini",
-    }
-    return langs.get(ext, "")
+    # No dot yields the bare name, which never matches a ".ext" key
+    _, dot, ext = name.rpartition(".")
+    return _EXT_LANG.get(dot + ext, "")
 
 
 def _read_file(path: str) -> str:
@@ -334,75 +421,114 @@ def _resolve_path(p: str) -> str:
     return os.path.abspath(os.path.expandvars(os.path.expanduser(p)))
 
 
+# "/file:PATH" or "/file PATH" on a line of its own (leading blanks allowed)
+_FILE_CMD_RE = re.compile(r"^[ \t]*/file(?::([^\n]*)|[ \t]+(\S[^\n]*))\n?", re.MULTILINE)
+
+
 def _parse_file_commands(text: str) -> Tuple[str, List[Tuple[str, str]]]:
     """Extract /file PATH lines and return (clean_text, attachments)."""
-    attachments: List[Tuple[str, str]] = []
-    kept_lines: List[str] = []
-
-    for line in text.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("/file"):
-            path = None
-            if stripped.startswith("/file:"):
-                path = _resolve_path(stripped.split(":", 1)[1])
-            else:
-                parts = line.split(None, 1)
-                if len(parts) == 2:
-                    path = _resolve_path(parts[1])
+    # Most messages attach nothing; skip the regex pass entirely
+    if "/file" not in text:
+        return text, []
 
-            if path:
-                try:
-                    content = _read_file(path)
-                    attachments.append((path, content))
-                    continue
-                except OSError as e:
-                    kept_lines.append(line)
-                    kept_lines.append(f"[Error reading {path}: {e}]")
-                    continue
+    attachments: List[Tuple[str, str]] = []
 
-        kept_lines.append(line)
+    def _attach(match: re.Match) -> str:
+        raw = match.group(1) if match.group(1) is not None else match.group(2)
+        path = _resolve_path(raw)
+        try:
+            attachments.append((path, _read_file(path)))
+            return ""
+        except OSError as e:
+            # Keep the command line and note the error below it
+            line = match.group(0)
+            newline = "\n" if line.endswith("\n") else ""
+            return f"{line.rstrip()}\n[Error reading {path}: {e}]{newline}"
 
-    return "\n".join(kept_lines), attachments
+    return _FILE_CMD_RE.sub(_attach, text), attachments
 
 
-def _build_message(prompt: str, attachments: List[Tuple[str, str]]) -> str:
-    """Build final message including file attachments in code blocks."""
-    if not attachments:
-        return prompt
-
-    parts = [prompt, ""]
+def _iter_message(prompt: str, attachments: List[Tuple[str, str]]) -> Iterator[str]:
+    """Yield the pieces of the final message without copying file contents."""
+    yield prompt
+    yield "\n\n"
     for path, content in attachments:
         fence = _choose_fence(content)
         lang = _language_from_filename(path)
+        yield f"\n\n[FILE: {path}]\n{fence}{lang}\n"
+        yield content
         if not content.endswith("\n"):
-            content += "\n"
+            yield "\n"
+        yield fence
 
-        if lang:
-            block = f"[FILE: {path}]\n{fence}{lang}\n{content}{fence}"
-        else:
-            block = f"[FILE: {path}]\n{fence}\n{content}{fence}"
-        parts.append(block)
 
-    return "\n\n".join(parts)
+def _build_message(prompt: str, attachments: List[Tuple[str, str]]) -> str:
+    """Build final message including file attachments in code blocks."""
+    if not attachments:
+        return prompt
+
+    buf = io.StringIO()
+    buf.writelines(_iter_message(prompt, attachments))
+    return buf.getvalue()
 
 
 # ============================================================================
 # Interactive TUI
 # ============================================================================
 
+def _insert_newline(event) -> None:
+    event.current_buffer.insert_text("\n")
+
+
+@lru_cache(maxsize=1)
+def _completions() -> Dict:
+    """Command completion tree; static, so built (with one PathCompleter) once."""
+    from prompt_toolkit.completion import PathCompleter
+
+    strategies = {"react": None, "rewoo": None, "plan-execute": None, "lats": None}
+    return {
+        "/file": PathCompleter(expanduser=True, only_directories=False),
+        "/tools": None,
+        "/help": None,
+        "/reasoning": {
+            "list": None,
+            "current": None,
+            "switch": strategies,
+            "info": strategies,
+        },
+        "/quit": None,
+        "/exit": None,
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_completer():
+    """Build the fuzzy command completer once per process."""
+    from prompt_toolkit.completion import NestedCompleter, FuzzyCompleter
+
+    try:
+        return FuzzyCompleter(NestedCompleter.from_nested_dict(_completions()))
+    except AttributeError:
+        return FuzzyCompleter(NestedCompleter(_completions()))
+
+
 def run_interactive(agent, session_id: str = "main_session") -> None:
     """Run interactive TUI with prompt_toolkit."""
+    from prompt_toolkit.shortcuts import PromptSession
+    from prompt_toolkit.key_binding import KeyBindings
+    from prompt_toolkit.styles import Style
+    from prompt_toolkit.patch_stdout import patch_stdout
+    from prompt_toolkit.keys import ALL_KEYS, KEY_ALIASES
+    from prompt_toolkit.filters import Condition
+    from prompt_toolkit.application.current import get_app
+
     dispatcher = CommandDispatcher(agent)
 
     # Display banner and help
     display_banner(agent)
     dispatcher._handle_help("", [])
 
-    # Setup completer
-    try:
-        completer = FuzzyCompleter(NestedCompleter.from_nested_dict(dispatcher.get_completions()))
-    except AttributeError:
-        completer = FuzzyCompleter(NestedCompleter(dispatcher.get_completions()))
+    completer = _get_completer()
 
     # Style
     style = Style.from_dict({"prompt": "fg:#888888"})
@@ -444,14 +570,12 @@ def run_interactive(agent, session_id: str = "main_session") -> None:
     def _(event):
         event.current_buffer.complete_previous()
 
-    # Shift/Ctrl/Alt-Enter for newlines
+    # Shift/Ctrl/Alt-Enter for newlines: one handler, registered only under
+    # the key names this prompt_toolkit version knows
+    known_keys = set(ALL_KEYS) | set(KEY_ALIASES)
     for key in ("s-enter", "c-enter", "a-enter", "c-j"):
-        try:
-            @kb.add(key)
-            def _(event):
-                event.current_buffer.insert_text("\n")
-        except Exception:
-            pass
+        if key in known_keys:
+            kb.add(key)(_insert_newline)
 
     @kb.add("c-s", filter=~menu_visible)
     def _(event):
@@ -500,14 +624,17 @@ def run_interactive(agent, session_id: str = "main_session") -> None:
 
             # Send to agent
             if result.should_process:
-                width = shutil.get_terminal_size(fallback=(80, 20)).columns
-                console.print("[dim]" + "-" * min(width, 120) + "[/dim]")
+                # prompt() replaced our SIGWINCH handler and dropped its own
+                # on return, so pick up resizes made at the prompt and track
+                # the ones made while the response streams
+                _track_term_cols()
+                console.print(_rule())
 
                 clean, attachments = _parse_file_commands(text)
-                message = _build_message(clean, attachments)
+                message = _build_message(clean, attachments) if attachments else clean
                 stream_response(agent, message, session_id)
 
-                console.print("[dim]" + "-" * min(width, 120) + "[/dim]")
+                console.print(_rule())
 
     except KeyboardInterrupt:
         pass
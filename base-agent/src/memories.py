@@ -13,8 +13,10 @@ User Isolation: Supports multi-user via user_id filtering (currently single-user
 
 import os
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import List, Set
 
 # Disable ChromaDB telemetry before importing chromadb
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
@@ -64,6 +66,58 @@ def get_vector_store():
     return _persistent_memory_vector_store
 
 
+# ─── Background Embedding ──────────────────────────────────────────────────────
+"""
+Saving a memory embeds it via the OpenAI API, which can take hundreds of ms.
+Writes are submitted to a small thread pool so the agent turn isn't blocked;
+searches wait for any pending writes first so results stay consistent.
+Failed writes are recorded and reported by the next memory tool call, so the
+agent learns that a memory it was told was queued never got stored.
+"""
+_embed_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-embed")
+_pending_embeds: Set[Future] = set()
+_failed_saves: List[str] = []
+_pending_lock = threading.Lock()
+
+
+def _add_documents_async(documents: List[Document]) -> None:
+    """Embed and store documents in the background."""
+    # Create the store on the calling thread to avoid racing the lazy init
+    store = get_vector_store()
+    future = _embed_pool.submit(store.add_documents, documents)
+    with _pending_lock:
+        _pending_embeds.add(future)
+
+    def _on_embed_done(done: Future) -> None:
+        """Drop a finished write from the pending set and record any failure."""
+        error = done.exception()
+        with _pending_lock:
+            _pending_embeds.discard(done)
+            if error is not None:
+                for document in documents:
+                    _failed_saves.append(f"Failed to save memory: {document.page_content} ({error})")
+        if error is not None:
+            logging.getLogger(__name__).error("Failed to save memory: %s", error)
+
+    future.add_done_callback(_on_embed_done)
+
+
+def _take_failed_saves() -> List[str]:
+    """Return and clear the notes for background writes that failed."""
+    with _pending_lock:
+        failed = list(_failed_saves)
+        _failed_saves.clear()
+    return failed
+
+
+def _wait_for_pending_embeds() -> None:
+    """Block until all in-flight memory writes have completed."""
+    with _pending_lock:
+        pending = list(_pending_embeds)
+    if pending:
+        wait(pending)
+
+
 # ─── Helper: Extract User ID ───────────────────────────────────────────────────
 def _get_user_id(config: RunnableConfig) -> str:
     """
@@ -129,7 +183,8 @@ def save_persistent_memory(memory: str, config: RunnableConfig) -> str:
         config: Runtime config (contains user_id for isolation)
 
     Returns:
-        Confirmation message
+        Confirmation that the memory was queued, preceded by notes for any
+        earlier saves that failed
 
     Example:
         save_persistent_memory(
@@ -149,10 +204,13 @@ def save_persistent_memory(memory: str, config: RunnableConfig) -> str:
         metadata={"user_id": user_id},
     )
 
-    # Add to vector store (lazy init)
-    get_vector_store().add_documents([document])
+    # Report failures of earlier background saves before queuing this one
+    failed = _take_failed_saves()
+
+    # Add to vector store in the background (lazy init)
+    _add_documents_async([document])
 
-    return f"Memory saved: {memory}"
+    return "\n".join(failed + [f"Memory queued for saving: {memory}"])
 
 
 # ─── Tool: Search Persistent Memories ──────────────────────────────────────────
@@ -185,7 +243,8 @@ def search_persistent_memories(query: str, config: RunnableConfig) -> List[str]:
         config: Runtime config (contains user_id for isolation)
 
     Returns:
-        List of relevant memories (top 3 most similar)
+        List of relevant memories (top 3 most similar), preceded by notes
+        for any earlier saves that failed
 
     Example:
         search_persistent_memories("How does user prefer code examples?", config)
@@ -193,6 +252,9 @@ def search_persistent_memories(query: str, config: RunnableConfig) -> List[str]:
     """
     user_id = _get_user_id(config)
 
+    # Make sure memories saved earlier in this session are searchable
+    _wait_for_pending_embeds()
+
     # Search with user_id filter (only this user's memories) - lazy init
     documents = get_vector_store().similarity_search(
         query,
@@ -201,4 +263,4 @@ def search_persistent_memories(query: str, config: RunnableConfig) -> List[str]:
     )
 
     # Extract and return content
-    return [doc.page_content for doc in documents]
+    return _take_failed_saves() + [doc.page_content for doc in documents]
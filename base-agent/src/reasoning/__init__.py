@@ -21,6 +21,11 @@ from .strategy_registry import (
     reset_global_registry,
 )
 
+from .graph_cache import (
+    get_compiled_graph,
+    clear_graph_cache,
+)
+
 from .strategies import (
     ReasoningStrategy,
     ReActStrategy,
@@ -49,6 +54,10 @@ __all__ = [
     "get_global_registry",
     "reset_global_registry",
 
+    # Graph cache
+    "get_compiled_graph",
+    "clear_graph_cache",
+
     # Strategies
     "ReasoningStrategy",
     "ReActStrategy",
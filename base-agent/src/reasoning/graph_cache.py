@@ -0,0 +1,70 @@
+"""
+Compiled Graph Cache
+
+Shares compiled strategy graphs across Agent instances. Agents that use the
+same strategy instance, LLM, and tool set get the same compiled graph, so
+each Agent attaches its own checkpointer (graph.copy) to keep its
+conversations separate and release them with the Agent.
+"""
+
+from collections import OrderedDict
+from typing import Any, List, Tuple
+
+from .strategies import ReasoningStrategy
+
+
+# Least recently used graphs are evicted past this many entries
+MAX_CACHED_GRAPHS = 32
+
+# Process-wide cache: key -> (graph, objects whose ids make up the key)
+_compiled_graphs: "OrderedDict[Tuple, Tuple[Any, Tuple]]" = OrderedDict()
+
+
+def get_compiled_graph(
+    strategy: ReasoningStrategy,
+    agent_state_class,
+    llm,
+    llm_with_tools,
+    tools: List,
+):
+    """
+    Get the compiled graph for a strategy, building it on first use.
+
+    The key uses object identities for the strategy, LLM and tools, so a
+    re-registered or newly constructed strategy gets its own graph even if
+    it shares a name with a cached one. Each entry keeps those objects
+    alive, so their ids stay unique while it is cached.
+
+    Args:
+        strategy: Strategy that builds the graph
+        agent_state_class: TypedDict defining the state schema
+        llm: Base LLM the tools were bound to
+        llm_with_tools: LLM with tools bound via llm.bind_tools()
+        tools: List of tool instances
+
+    Returns:
+        Compiled LangGraph ready to execute
+    """
+    key = (
+        id(strategy),
+        agent_state_class,
+        id(llm),
+        tuple(id(tool) for tool in tools),
+    )
+
+    entry = _compiled_graphs.get(key)
+    if entry is not None:
+        _compiled_graphs.move_to_end(key)
+        return entry[0]
+
+    graph = strategy.create_graph(agent_state_class, llm_with_tools, tools)
+    _compiled_graphs[key] = (graph, (strategy, llm, tuple(tools)))
+    if len(_compiled_graphs) > MAX_CACHED_GRAPHS:
+        _compiled_graphs.popitem(last=False)
+
+    return graph
+
+
+def clear_graph_cache() -> None:
+    """Drop all cached graphs (useful for testing)."""
+    _compiled_graphs.clear()
@@ -5,7 +5,7 @@ All reasoning strategies must implement this interface to be compatible with the
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional
 
 
 class ReasoningStrategy(ABC):
@@ -73,6 +73,30 @@ class ReasoningStrategy(ABC):
         """
         return True
 
+    def needs_tool_guide(self) -> bool:
+        """
+        Check if the agent should inject the shared tool guide into the thread.
+
+        Strategies that embed the guide in their own planning prompt can
+        return False to keep it out of every other LLM call's prefix.
+
+        Returns:
+            True if the tool guide SystemMessage should be sent, False otherwise
+        """
+        return True
+
+    def get_trace_nodes(self) -> FrozenSet[str]:
+        """
+        Get graph nodes whose LLM output is re-emitted as a trace message.
+
+        The agent suppresses token streams from these nodes so the wrapped
+        message (e.g. "[PLAN CREATED]") is shown once instead of twice.
+
+        Returns:
+            Set of node names
+        """
+        return frozenset()
+
     def get_trace_info(self, state: Optional[Any] = None) -> Dict[str, Any]:
         """
         Get debug/trace information about the current reasoning step.
@@ -38,6 +38,17 @@ from langgraph.checkpoint.memory import MemorySaver
 from .base import ReasoningStrategy
 
 
+# Markers prefixing the trace messages this strategy emits
+CANDIDATES_MARKER = "[CANDIDATES GENERATED]"
+REFLECTION_MARKER = "[REFLECTION]"
+
+
+def _has_marker(msg, marker: str) -> bool:
+    """Whether msg is an AIMessage whose content starts with the trace marker."""
+    # Markers are always a prefix, so this never scans the whole content
+    return isinstance(msg, AIMessage) and isinstance(msg.content, str) and msg.content.startswith(marker)
+
+
 class LATSStrategy(ReasoningStrategy):
     """Simplified LATS (Language Agent Tree Search) strategy."""
 
@@ -148,7 +159,7 @@ Then select the BEST candidate and explain why. Format: "SELECTED: [number]" fol
 
             # Store candidates in a special message
             candidates_message = AIMessage(
-                content=f"[CANDIDATES GENERATED]\n\n{response.content}"
+                content=f"{CANDIDATES_MARKER}\n\n{response.content}"
             )
 
             return {"messages": [candidates_message]}
@@ -162,8 +173,8 @@ Then select the BEST candidate and explain why. Format: "SELECTED: [number]" fol
             task = None
 
             for msg in reversed(messages):
-                if isinstance(msg, AIMessage) and "[CANDIDATES GENERATED]" in msg.content:
-                    candidates_content = msg.content.replace("[CANDIDATES GENERATED]", "").strip()
+                if _has_marker(msg, CANDIDATES_MARKER):
+                    candidates_content = msg.content[len(CANDIDATES_MARKER):].strip()
                 if isinstance(msg, HumanMessage):
                     task = msg.content
 
@@ -182,7 +193,7 @@ Then select the BEST candidate and explain why. Format: "SELECTED: [number]" fol
 
             # Mark this as a reflection
             reflection_message = AIMessage(
-                content=f"[REFLECTION]\n\n{response.content}"
+                content=f"{REFLECTION_MARKER}\n\n{response.content}"
             )
 
             return {"messages": [reflection_message]}
@@ -216,14 +227,14 @@ Then select the BEST candidate and explain why. Format: "SELECTED: [number]" fol
                 return "tools"
 
             # If we just generated candidates, reflect on them
-            if isinstance(last_message, AIMessage) and "[CANDIDATES GENERATED]" in last_message.content:
+            if _has_marker(last_message, CANDIDATES_MARKER):
                 if self.enable_reflection:
                     return "reflect"
                 else:
                     return "execute"
 
             # If we just reflected, execute the selected action
-            if isinstance(last_message, AIMessage) and "[REFLECTION]" in last_message.content:
+            if _has_marker(last_message, REFLECTION_MARKER):
                 return "execute"
 
             # If we just executed, check if we need more exploration
@@ -300,6 +311,10 @@ Then select the BEST candidate and explain why. Format: "SELECTED: [number]" fol
 
         return workflow.compile(checkpointer=memory)
 
+    def get_trace_nodes(self) -> frozenset:
+        """Candidates and reflections are shown as marker messages."""
+        return frozenset({"candidates", "reflect"})
+
     def get_trace_info(self, state=None) -> dict:
         """Get trace information."""
         info = super().get_trace_info(state)
@@ -15,7 +15,8 @@ Best for:
 Performance: Fast, reliable, industry standard
 """
 
-from typing import Literal, List
+import re
+from typing import Callable, Dict, Literal, List, Optional
 from langchain_core.messages import AIMessage, ToolMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
@@ -24,17 +25,80 @@ from langgraph.checkpoint.memory import MemorySaver
 from .base import ReasoningStrategy
 
 
+# A tool pipeline maps a tool's result to follow-up tool calls that can run
+# immediately, saving an LLM round-trip for deterministic next steps
+ToolPipeline = Callable[[ToolMessage], List[dict]]
+
+
+def _extract_urls_from_ddgs(content: str, max_urls: int = 2) -> List[str]:
+    urls = re.findall(r"URL:\s*(\S+)", content)
+    # Deduplicate and keep first N
+    seen = set()
+    out: List[str] = []
+    for u in urls:
+        if u not in seen:
+            out.append(u)
+            seen.add(u)
+        if len(out) >= max_urls:
+            break
+    return out
+
+
+def follow_search_links(msg: ToolMessage) -> List[dict]:
+    """ddgs_search -> web_fetch the top 1-2 result URLs."""
+    urls = _extract_urls_from_ddgs(str(msg.content), max_urls=2)
+    return [
+        {"name": "web_fetch", "args": {"url": u}, "id": f"fl{i}"}
+        for i, u in enumerate(urls, start=1)
+    ]
+
+
+# Lines of context read on each side of a single grep match
+GREP_CONTEXT_LINES = 20
+
+
+def read_single_grep_match(msg: ToolMessage) -> List[dict]:
+    """grep_code -> read_file around the match when exactly one line matched."""
+    lines = str(msg.content).strip().splitlines()
+    if len(lines) != 1:
+        return []
+    # grep_code emits "file:line:content"
+    parts = lines[0].split(":", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return []
+    line = int(parts[1])
+    args = {
+        "file_path": parts[0],
+        "start_line": max(1, line - GREP_CONTEXT_LINES),
+        "end_line": line + GREP_CONTEXT_LINES,
+    }
+    return [{"name": "read_file", "args": args, "id": "rf1"}]
+
+
+DEFAULT_TOOL_PIPELINES: Dict[str, ToolPipeline] = {
+    "ddgs_search": follow_search_links,
+    "grep_code": read_single_grep_match,
+}
+
+
 class ReActStrategy(ReasoningStrategy):
     """ReAct (Reason + Act) reasoning strategy implementation."""
 
-    def __init__(self, max_iterations: int = 20):
+    def __init__(
+        self,
+        max_iterations: int = 20,
+        tool_pipelines: Optional[Dict[str, ToolPipeline]] = None
+    ):
         """
         Initialize ReAct strategy.
 
         Args:
             max_iterations: Maximum number of thought-action cycles (prevents infinite loops)
+            tool_pipelines: Follow-up tool calls to run after a tool, keyed by
+                tool name (defaults to DEFAULT_TOOL_PIPELINES)
         """
         self.max_iterations = max_iterations
+        self.tool_pipelines = dict(DEFAULT_TOOL_PIPELINES if tool_pipelines is None else tool_pipelines)
         self._iteration_count = 0
 
     def get_name(self) -> str:
@@ -92,41 +156,23 @@ class ReActStrategy(ReasoningStrategy):
 
             return {"messages": [response]}
 
-        def _extract_urls_from_ddgs(content: str, max_urls: int = 2) -> List[str]:
-            import re
-            urls = re.findall(r"URL:\s*(\S+)", content)
-            # Deduplicate and keep first N
-            seen = set()
-            out: List[str] = []
-            for u in urls:
-                if u not in seen:
-                    out.append(u)
-                    seen.add(u)
-                if len(out) >= max_urls:
-                    break
-            return out
-
-        def follow_links_node(state):
-            """If the last tool output was a ddgs_search, fetch top URLs automatically."""
-            messages = state["messages"]
-            # Find the last ddgs_search tool result
-            last_tool: ToolMessage | None = None
+        def _last_tool_message(messages) -> Optional[ToolMessage]:
             for msg in reversed(messages):
-                if isinstance(msg, ToolMessage) and hasattr(msg, "name") and msg.name == "ddgs_search":
-                    last_tool = msg
-                    break
-            if not last_tool:
+                if isinstance(msg, ToolMessage):
+                    return msg
+            return None
+
+        def pipeline_node(state):
+            """Run the registered pipeline for the last tool result, if any."""
+            last_tool = _last_tool_message(state["messages"])
+            pipeline = self.tool_pipelines.get(getattr(last_tool, "name", None))
+            if not pipeline:
                 return {"messages": []}
 
-            urls = _extract_urls_from_ddgs(str(last_tool.content), max_urls=2)
-            if not urls:
+            # Emit the follow-up calls directly, skipping an LLM round-trip
+            tool_calls = pipeline(last_tool)
+            if not tool_calls:
                 return {"messages": []}
-
-            # Build explicit web_fetch tool calls for the top URLs
-            tool_calls = [
-                {"name": "web_fetch", "args": {"url": u}, "id": f"fl{i}"}
-                for i, u in enumerate(urls, start=1)
-            ]
             return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
 
         # Create the graph
@@ -135,7 +181,7 @@ class ReActStrategy(ReasoningStrategy):
         # Add nodes
         workflow.add_node("agent", agent_node)
         workflow.add_node("tools", ToolNode(tools))
-        workflow.add_node("follow_links", follow_links_node)
+        workflow.add_node("pipeline", pipeline_node)
 
         # Define the flow
         workflow.add_edge(START, "agent")
@@ -150,42 +196,26 @@ class ReActStrategy(ReasoningStrategy):
             }
         )
 
-        # After tools execute, decide whether to auto-follow search links
-        def after_tools_route(state) -> Literal["follow_links", "agent"]:
-            messages = state["messages"]
-            # Find the last tool name
-            last_tool_name = None
-            for msg in reversed(messages):
-                if isinstance(msg, ToolMessage):
-                    last_tool_name = getattr(msg, "name", None)
-                    break
-            if last_tool_name == "ddgs_search":
-                # Check if a web_fetch happened after this ddgs_search already
-                # Find index of that tool message
-                idx = None
-                for i in range(len(messages) - 1, -1, -1):
-                    m = messages[i]
-                    if isinstance(m, ToolMessage) and getattr(m, "name", None) == "ddgs_search":
-                        idx = i
-                        break
-                if idx is not None:
-                    for m in messages[idx + 1:]:
-                        if isinstance(m, ToolMessage) and getattr(m, "name", None) == "web_fetch":
-                            return "agent"
-                return "follow_links"
+        # After tools execute, run a fused follow-up step if one is registered
+        # for the last tool. Pipelined calls (web_fetch, read_file) have no
+        # pipeline of their own, so this never loops.
+        def after_tools_route(state) -> Literal["pipeline", "agent"]:
+            last_tool = _last_tool_message(state["messages"])
+            if getattr(last_tool, "name", None) in self.tool_pipelines:
+                return "pipeline"
             return "agent"
 
         workflow.add_conditional_edges(
             "tools",
             after_tools_route,
             {
-                "follow_links": "follow_links",
+                "pipeline": "pipeline",
                 "agent": "agent",
             },
         )
 
-        # After follow_links, if it emitted tool_calls -> tools; else -> agent
-        def after_follow_links_route(state) -> Literal["tools", "agent"]:
+        # After the pipeline, if it emitted tool_calls -> tools; else -> agent
+        def after_pipeline_route(state) -> Literal["tools", "agent"]:
             messages = state["messages"]
             last = messages[-1]
             if isinstance(last, AIMessage) and getattr(last, "tool_calls", None):
@@ -193,8 +223,8 @@ class ReActStrategy(ReasoningStrategy):
             return "agent"
 
         workflow.add_conditional_edges(
-            "follow_links",
-            after_follow_links_route,
+            "pipeline",
+            after_pipeline_route,
             {
                 "tools": "tools",
                 "agent": "agent",
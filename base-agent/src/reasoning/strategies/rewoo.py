@@ -281,6 +281,14 @@ Rules:
 
         return workflow.compile(checkpointer=memory)
 
+    def needs_tool_guide(self) -> bool:
+        """The planner formats the tool guide into its own prompt."""
+        return False
+
+    def get_trace_nodes(self) -> frozenset:
+        """Planner output is shown as a [PLAN CREATED] message."""
+        return frozenset({"planner"})
+
     def get_trace_info(self, state=None) -> dict:
         """Get trace information."""
         info = super().get_trace_info(state)
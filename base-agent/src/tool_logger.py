@@ -49,13 +49,9 @@ class ToolLogger:
         if not instance.enabled:
             return
 
-        # Add blank line before each tool (except first)
-        print("", file=sys.stderr, flush=True)
-
-        if args_str:
-            print(f"\033[2m⏺ {tool_name}({args_str})\033[0m", file=sys.stderr, flush=True)
-        else:
-            print(f"\033[2m⏺ {tool_name}\033[0m", file=sys.stderr, flush=True)
+        # Add blank line before each tool (except first); one write, one flush
+        label = f"{tool_name}({args_str})" if args_str else tool_name
+        _write_stderr(f"\n\033[2m⏺ {label}\033[0m\n")
 
     @classmethod
     def log_complete(cls, summary: str):
@@ -126,6 +122,12 @@ class ToolLogger:
         return instance.enabled
 
 
+def _write_stderr(text: str) -> None:
+    """Write pre-joined log output to stderr with a single flush."""
+    sys.stderr.write(text)
+    sys.stderr.flush()
+
+
 # Convenience functions for direct import
 def log_tool_start(tool_name: str, description: str = "", args_str: str = ""):
     """Log tool execution start."""
@@ -238,17 +240,17 @@ def log_diff(old_content: str, new_content: str, filename: str, context_lines: i
     # Check if diff is too large
     total_diff_lines = len([l for l in diff_lines if not l.startswith('---') and not l.startswith('+++') and not l.startswith('@@')])
 
+    # Collect output lines and write them in one go rather than flushing per line
+    out = [f"\033[2m  • Edited {filename} (+{additions} -{deletions})\033[0m"]
+
     if total_diff_lines > max_lines:
         # Show summary for large diffs
-        print(f"\033[2m  • Edited {filename} (+{additions} -{deletions})\033[0m", file=sys.stderr, flush=True)
-        print(f"\033[2m    [Large diff: {total_diff_lines} lines changed, showing summary only]\033[0m", file=sys.stderr, flush=True)
-        print(f"\033[2m    Changes: +{additions} additions, -{deletions} deletions\033[0m", file=sys.stderr, flush=True)
-        print("", file=sys.stderr, flush=True)
+        out.append(f"\033[2m    [Large diff: {total_diff_lines} lines changed, showing summary only]\033[0m")
+        out.append(f"\033[2m    Changes: +{additions} additions, -{deletions} deletions\033[0m")
+        out.append("")
+        _write_stderr("\n".join(out) + "\n")
         return
 
-    # Print header
-    print(f"\033[2m  • Edited {filename} (+{additions} -{deletions})\033[0m", file=sys.stderr, flush=True)
-
     # Get lexer for syntax highlighting
     lexer = None
     if syntax_highlight:
@@ -279,19 +281,20 @@ def log_diff(old_content: str, new_content: str, filename: str, context_lines: i
 
         if line.startswith('-'):
             # Deletion: show old line number, red
-            print(f"\033[2m    {old_line_num:<4} \033[31m-   {line_content}\033[0m", file=sys.stderr, flush=True)
+            out.append(f"\033[2m    {old_line_num:<4} \033[31m-   {line_content}\033[0m")
             old_line_num += 1
         elif line.startswith('+'):
             # Addition: show new line number, green
-            print(f"\033[2m    {new_line_num:<4} \033[32m+   {line_content}\033[0m", file=sys.stderr, flush=True)
+            out.append(f"\033[2m    {new_line_num:<4} \033[32m+   {line_content}\033[0m")
             new_line_num += 1
         else:
             # Context line: show new line number, grey
-            print(f"\033[2m    {new_line_num:<4}     {line_content}\033[0m", file=sys.stderr, flush=True)
+            out.append(f"\033[2m    {new_line_num:<4}     {line_content}\033[0m")
             old_line_num += 1
             new_line_num += 1
 
-    print("", file=sys.stderr, flush=True)  # Blank line after diff
+    out.append("")  # Blank line after diff
+    _write_stderr("\n".join(out) + "\n")
 
 
 def _get_lexer_for_file(filename: str):
@@ -10,32 +10,152 @@ TUI commands:
 Environment:
     SERVER: server URL (default http://localhost:8000/chat)
     THREAD_ID: conversation thread id (default random)
+    MAX_ATTACH_BYTES: truncate larger /file attachments (default 1 MiB)
 """
 from __future__ import annotations
 
+import io
 import os
+import functools
+import re
 import sys
 from uuid import uuid4
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 import threading
 import time
 import itertools
 import shutil
+import signal
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
-from rich.console import Console
+from rich.console import Console, Group, NewLine
+from rich.live import Live
 from rich.markdown import Markdown
+from markdown_it import MarkdownIt
 
 SERVER = os.getenv("SERVER", "http://localhost:8000/chat")
 THREAD_ID = os.getenv("THREAD_ID", str(uuid4()))
+# Attachments larger than this keep only their head and tail
+MAX_ATTACH_BYTES = int(os.getenv("MAX_ATTACH_BYTES", str(1024 * 1024)))
 
 console = Console()
 
+# Terminal width for the response rules; refreshed on SIGWINCH by the TUI
+# rather than queried with an ioctl before and after every response
+_term_cols = [shutil.get_terminal_size(fallback=(80, 20)).columns]
 
-def stream_once(prompt: str) -> None:
-    accumulated = ""
 
-    with console.status("[blue]Thinking...", spinner="dots"):
+def _refresh_term_cols(*_) -> None:
+    _term_cols[0] = shutil.get_terminal_size(fallback=(80, 20)).columns
+
+
+def _track_term_cols() -> None:
+    # prompt() leaves SIGWINCH at its default disposition when it returns,
+    # so the TUI calls this once per turn to refresh and re-install
+    _refresh_term_cols()
+    if hasattr(signal, "SIGWINCH"):
+        signal.signal(signal.SIGWINCH, _refresh_term_cols)
+
+
+@functools.lru_cache(maxsize=8)
+def _rule_for_width(width: int) -> str:
+    return "-" * max(20, min(120, width))
+
+
+def _rule() -> str:
+    # Widths rarely change, so the separator string is built once per width
+    return _rule_for_width(_term_cols[0])
+
+
+# Responses larger than this switch to plain text output; rich's Markdown
+# parser gets slow and allocation-heavy on very large inputs
+MARKDOWN_MAX_CHARS = 256 * 1024
+
+
+# Same block rules as rich.markdown.Markdown, so both agree on where the
+# top-level blocks of a streamed response start
+_md_parser = MarkdownIt().enable("strikethrough").enable("table")
+# Container blocks that Markdown starts with a blank line of their own
+_SELF_SPACED_BLOCKS = {"bullet_list_open", "ordered_list_open", "blockquote_open", "table_open"}
+
+
+def _block_starts(text: str) -> List[Tuple[int, str]]:
+    # (first line, token type) of each top-level block
+    return [
+        (tok.map[0], tok.type)
+        for tok in _md_parser.parse(text)
+        if tok.level == 0 and tok.nesting >= 0 and tok.map
+    ]
+
+
+def _spaced(prev_type: str, next_type: str) -> bool:
+    # Markdown puts a blank line between top-level blocks, except after a
+    # horizontal rule; lists, quotes and tables render their own
+    return prev_type != "hr" and next_type not in _SELF_SPACED_BLOCKS
+
+
+class _MarkdownStream:
+    """Markdown for a streamed response, re-parsing only the open block.
+
+    A top-level block is final once the next one has started, so the text
+    before the last top-level block is parsed once and kept; only the
+    trailing block is parsed again when Live refreshes. Blank lines inside
+    lists and code fences nested in list items stay with their block.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: list = []
+        self._last_type = ""         # type of the last kept block
+        self._lines: List[str] = []  # complete lines from the open block on
+        self._tail = ""              # partial last line
+        self._lock = threading.Lock()
+
+    def feed(self, chunk: str) -> None:
+        pieces = chunk.split("\n")
+        with self._lock:
+            pieces[0] = self._tail + pieces[0]
+            self._tail = pieces.pop()
+            self._lines.extend(pieces)
+
+    def __rich__(self):
+        # Called by Live on each refresh, so parsing is capped at its rate.
+        # feed() only appends, so the lines seen here stay at the front.
+        with self._lock:
+            lines = self._lines[:]
+            tail = self._tail
+        pending = lines + [tail]
+        starts = _block_starts("\n".join(pending))
+        # Keep every block followed by one that starts on a complete line
+        split = next((i for i in range(len(starts) - 1, 0, -1) if starts[i][0] < len(lines)), 0)
+        if split:
+            line = starts[split][0]
+            if self._blocks and _spaced(self._last_type, starts[0][1]):
+                self._blocks.append(NewLine())
+            self._blocks.append(Markdown("\n".join(lines[:line])))
+            self._last_type = starts[split - 1][1]
+            with self._lock:
+                del self._lines[:line]
+            pending = pending[line:]
+            starts = starts[split:]
+        parts = list(self._blocks)
+        if parts and starts and _spaced(self._last_type, starts[0][1]):
+            parts.append(NewLine())
+        parts.append(Markdown("\n".join(pending)))
+        return Group(*parts)
+
+
+def stream_once(prompt: str, footer: Optional[Callable[[], str]] = None) -> None:
+    """Stream one reply; footer (e.g. the TUI's rule) is built once the reply
+    ends and written with the closing spacing in a single print."""
+    md = _MarkdownStream()
+    size = 0
+    live = None
+    plain = False
+
+    status = console.status("[blue]Thinking...", spinner="dots")
+    status.start()
+    try:
         try:
             with httpx.stream(
                 "POST",
@@ -45,126 +165,239 @@ def stream_once(prompt: str) -> None:
             ) as r:
                 r.raise_for_status()
                 for chunk in r.iter_text():
-                    if chunk:
-                        accumulated += chunk
-        except Exception as e:
-            console.print(f"[red]Error: {e}[/red]")
-            return
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if plain:
+                        console.print(chunk, end="", markup=False, highlight=False)
+                        continue
+                    md.feed(chunk)
+                    if live is None:
+                        # First output: swap the spinner for the live view
+                        status.stop()
+                        # Transient and cropped to the screen, so a reply taller
+                        # than the terminal is not redrawn into the scrollback;
+                        # the final render is printed once when the view stops
+                        live = Live(md, console=console, refresh_per_second=10, transient=True)
+                        live.start()
+                    if size > MARKDOWN_MAX_CHARS:
+                        # Print what is rendered and the rest as plain text
+                        live.stop()
+                        console.print(md)
+                        plain = True
+        finally:
+            # Also runs on Ctrl-C, so the cursor and console are always restored
+            # and the text received so far stays on screen
+            status.stop()
+            if live is not None and not plain:
+                live.stop()
+                console.print(md)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        if footer:
+            console.print(footer(), markup=False, highlight=False)
+        return
+
+    # Extra newline for spacing, plus the footer in the same write
+    console.print("\n" + footer() if footer else "", markup=False, highlight=False)
+
 
-    # Render accumulated response as markdown
-    if accumulated.strip():
-        md = Markdown(accumulated)
-        console.print(md)
-    console.print()  # Extra newline for spacing
+# Runs shorter than three never affect the fence; inline `code` spans are
+# common in text files, so skip building a match object for each of them
+_BACKTICK_RUN_RE = re.compile(r"`{3,}")
 
 
 def _max_backtick_run(s: str) -> int:
-    max_run = run = 0
-    for ch in s:
-        if ch == "`":
-            run += 1
-            if run > max_run:
-                max_run = run
-        else:
-            run = 0
-    return max_run
+    # Longest run of 3+ backticks (0 if none), found by the regex engine
+    return max(map(len, _BACKTICK_RUN_RE.findall(s)), default=0)
 
 
+# Re-attached files come back as the same cached str object, so the lookup
+# is an identity hit on a hash str has already cached
+@functools.lru_cache(maxsize=16)
 def _choose_fence(content: str) -> str:
+    # Without a run of three backticks the fence is always the minimum, so
+    # files with only inline `code` spans skip the scan as well
+    if "```" not in content:
+        return "```"
     # Choose a backtick fence longer than any backtick run in content; min 3
     length = max(3, _max_backtick_run(content) + 1)
     return "`" * length
 
 
+_LANG_BY_EXT = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".sh": "bash",
+    ".bash": "bash",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".md": "markdown",
+    ".txt": "text",
+    ".go": "go",
+    ".rs": "rust",
+    ".java": "java",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".toml": "toml",
+    ".ini": "ini",
+}
+
+_SPECIAL_NAMES = {"dockerfile": "dockerfile"}
+
+
+@functools.lru_cache(maxsize=512)
 def _language_from_filename(path: str) -> str:
-    name = os.path.basename(path)
-    lower = name.lower()
-    if lower == "dockerfile":
-        return "dockerfile"
-    ext = os.path.splitext(lower)[1]
-    return {
-        ".py": "python",
-        ".js": "javascript",
-        ".ts": "typescript",
-        ".sh": "bash",
-        ".bash": "bash",
-        ".json": "json",
-        ".yaml": "yaml",
-        ".yml": "yaml",
-        ".md": "markdown",
-        ".txt": "text",
-        ".go": "go",
-        ".rs": "rust",
-        ".java": "java",
-        ".c": "c",
-        ".cpp": "cpp",
-        ".toml": "toml",
-        ".ini": "ini",
-    }.get(ext, "")
+    lower = os.path.basename(path).lower()
+    special = _SPECIAL_NAMES.get(lower)
+    if special:
+        return special
+    dot = lower.rfind(".")
+    return _LANG_BY_EXT.get(lower[dot:], "") if dot >= 0 else ""
 
 
 def _read_text_file(path: str) -> Tuple[str, int]:
-    with open(path, "r", encoding="utf-8", errors="replace") as fh:
-        data = fh.read()
-    return data, len(data.encode("utf-8"))
+    size = os.path.getsize(path)
+    if size <= MAX_ATTACH_BYTES:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            return fh.read(), size
+    # Oversized: read only the head and tail instead of the whole file
+    keep = MAX_ATTACH_BYTES // 2
+    with open(path, "rb") as fh:
+        head = fh.read(keep)
+        fh.seek(-keep, os.SEEK_END)
+        tail = fh.read()
+    marker = f"\n[... truncated {size - 2 * keep} bytes ...]\n"
+    data = head.decode("utf-8", errors="replace") + marker + tail.decode("utf-8", errors="replace")
+    return data, size
 
 
 def _strip_quotes(s: str) -> str:
-    if (s.startswith("'") and s.endswith("'")) or (s.startswith('"') and s.endswith('"')):
+    if len(s) >= 2 and s[0] == s[-1] and s[0] in ("'", '"'):
         return s[1:-1]
     return s
 
 
 def _resolve_path(p: str) -> str:
     p = _strip_quotes(p.strip())
-    p = os.path.expanduser(p)
-    p = os.path.expandvars(p)
+    # Plain paths are common; only expand when there is something to expand
+    if "~" in p:
+        p = os.path.expanduser(p)
+    if "$" in p or "%" in p:
+        p = os.path.expandvars(p)
     return os.path.abspath(p)
 
 
+@functools.lru_cache(maxsize=16)
+def _read_text_file_cached(path: str, mtime_ns: int, size: int) -> str:
+    # Keyed on mtime and size so re-attaching an unchanged file is free
+    # while an edited one is read again
+    content, _ = _read_text_file(path)
+    return content
+
+
+def _read_attachment(path: str):
+    """Read one attachment for the thread pool; returns content or the OSError."""
+    try:
+        st = os.stat(path)
+        return _read_text_file_cached(path, st.st_mtime_ns, st.st_size)
+    except OSError as e:
+        return e
+
+
+# A line that attaches a file: "/file:PATH" or "/file PATH" (plus its newline)
+_FILE_CMD_RE = re.compile(r"^[ \t]*/file(?::([^\n]*)|[ \t]+(\S[^\n]*))\n?", re.MULTILINE)
+
+
 def _parse_file_commands(text: str) -> Tuple[str, List[Tuple[str, str]]]:
     """Extract /file PATH lines and return (clean_text, attachments)."""
+    # One regex scan finds the command lines; the rest of the text is
+    # never split into lines. Common case: no match, text returned as-is.
+    matches = list(_FILE_CMD_RE.finditer(text))
+    if not matches:
+        return text, []
+
+    paths = [
+        _resolve_path(m.group(1) if m.group(1) is not None else m.group(2))
+        for m in matches
+    ]
+
+    # Overlap the I/O when several files are attached
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+            results = list(pool.map(_read_attachment, paths))
+    else:
+        results = [_read_attachment(path) for path in paths]
+
+    # Stitch the text back together around the command lines
     attachments: List[Tuple[str, str]] = []
-    kept_lines: List[str] = []
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if line.startswith("/file"):
-            path = None
-            if line.startswith("/file:"):
-                path = _resolve_path(line.split(":", 1)[1])
-            else:
-                parts = raw_line.split(None, 1)
-                if len(parts) == 2:
-                    path = _resolve_path(parts[1])
-            if path:
-                try:
-                    content, _ = _read_text_file(path)
-                    attachments.append((path, content))
-                except OSError as e:
-                    kept_lines.append(raw_line)
-                    kept_lines.append(f"[client] Failed to read {path}: {e}")
-                continue
-        kept_lines.append(raw_line)
-    clean_text = "\n".join(kept_lines)
+    pieces: List[str] = []
+    pos = 0
+    for m, path, result in zip(matches, paths, results):
+        pieces.append(text[pos:m.start()])
+        pos = m.end()
+        if isinstance(result, OSError):
+            line = m.group(0)
+            pieces.append(f"{line.rstrip()}\n[client] Failed to read {path}: {result}")
+            if line.endswith("\n"):
+                pieces.append("\n")
+        else:
+            attachments.append((path, result))
+    pieces.append(text[pos:])
+    clean_text = "".join(pieces)
     return clean_text, attachments
 
 
 def _build_message(prompt: str, attachments: List[Tuple[str, str]]) -> str:
     if not attachments:
         return prompt
-    parts = [prompt, ""]
+    # Write pieces straight into one buffer; no per-file block temporaries
+    buf = io.StringIO()
+    buf.write(prompt)
+    buf.write("\n\n")
     for path, content in attachments:
         fence = _choose_fence(content)
         lang = _language_from_filename(path)
-        header = f"[FILE: {path}]"
+        buf.write("\n\n[FILE: ")
+        buf.write(path)
+        buf.write("]\n")
+        buf.write(fence)
+        buf.write(lang)
+        buf.write("\n")
+        buf.write(content)
         if not content.endswith("\n"):
-            content = content + "\n"
-        if lang:
-            block = f"{header}\n{fence}{lang}\n{content}{fence}"
-        else:
-            block = f"{header}\n{fence}\n{content}{fence}"
-        parts.append(block)
-    return "\n\n".join(parts)
+            buf.write("\n")
+        buf.write(fence)
+    return buf.getvalue()
+
+
+# TUI command completions; _PATH marks where a PathCompleter goes
+_PATH = object()
+_COMPLETER_SPEC = {
+    "/file": _PATH,
+    "/enter": {"send": None, "newline": None},
+    "/quit": None,
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_completer():
+    """Build the TUI completer once (handles prompt_toolkit version differences)."""
+    from prompt_toolkit.completion import NestedCompleter, PathCompleter
+
+    path_completer = PathCompleter(expanduser=True)
+    spec = {k: (path_completer if v is _PATH else v) for k, v in _COMPLETER_SPEC.items()}
+    try:
+        return NestedCompleter.from_nested_dict(spec)
+    except AttributeError:
+        try:
+            # Older versions may accept dict in constructor
+            return NestedCompleter(spec)
+        except Exception:
+            from prompt_toolkit.completion import WordCompleter
+            return WordCompleter(list(_COMPLETER_SPEC))  # minimal fallback
 
 
 def _run_tui() -> None:
@@ -180,8 +413,7 @@ def _run_tui() -> None:
         from prompt_toolkit.shortcuts import PromptSession
         from prompt_toolkit.key_binding import KeyBindings
         from prompt_toolkit.styles import Style
-        from prompt_toolkit.completion import NestedCompleter, PathCompleter
-        from prompt_toolkit.patch_stdout import patch_stdout
+        from prompt_toolkit.keys import ALL_KEYS, KEY_ALIASES
     except Exception:
         print("prompt_toolkit not installed. Run: pip install prompt_toolkit httpx")
         # Fallback to simple REPL
@@ -200,24 +432,7 @@ def _run_tui() -> None:
     # Enter key behavior: default send-on-enter; can toggle to newline-on-enter.
     send_on_enter = [True]  # list for mutability in closures
 
-    # Build completer (handle prompt_toolkit version differences)
-    try:
-        completer = NestedCompleter.from_nested_dict({
-            "/file": PathCompleter(expanduser=True),
-            "/enter": {"send": None, "newline": None},
-            "/quit": None,
-        })
-    except AttributeError:
-        try:
-            # Older versions may accept dict in constructor
-            completer = NestedCompleter({
-                "/file": PathCompleter(expanduser=True),
-                "/enter": {"send": None, "newline": None},
-                "/quit": None,
-            })
-        except Exception:
-            from prompt_toolkit.completion import WordCompleter
-            completer = WordCompleter(["/file", "/enter", "/quit"])  # minimal fallback
+    completer = _get_completer()
 
     # Style for the left bar
     style = Style.from_dict({
@@ -234,22 +449,29 @@ def _run_tui() -> None:
     # Try to enable terminal key-reporting protocols so Shift/Alt/Ctrl modified
     # Enter can be distinguished without user configuration in many terminals
     # (iTerm2, kitty, xterm). These are no-ops on unsupported terminals.
-    def _term_write(seq: str) -> None:
+    def _term_write(seq: bytes) -> None:
         try:
-            sys.stdout.write(seq)
+            # Flush pending text first so ordering is kept, then write the
+            # raw bytes directly (no text-layer encode)
             sys.stdout.flush()
+            sys.stdout.buffer.write(seq)
+            sys.stdout.buffer.flush()
         except Exception:
             pass
 
     def _enable_modified_keys() -> None:
         # kitty keyboard protocol (CSI u) and xterm modifyOtherKeys (v2)
-        # If unsupported, terminals ignore silently.
-        _term_write("\x1b[>1u")      # Enable CSI u key reporting
-        _term_write("\x1b[>4;2m")    # Enable modifyOtherKeys level 2
+        # If unsupported, terminals ignore silently. Sent in one write.
+        _term_write(
+            b"\x1b[>1u"      # Enable CSI u key reporting
+            b"\x1b[>4;2m"    # Enable modifyOtherKeys level 2
+        )
 
     def _disable_modified_keys() -> None:
-        _term_write("\x1b[>0u")      # Disable CSI u key reporting
-        _term_write("\x1b[>4;0m")    # Disable modifyOtherKeys
+        _term_write(
+            b"\x1b[>0u"      # Disable CSI u key reporting
+            b"\x1b[>4;0m"    # Disable modifyOtherKeys
+        )
 
     _enable_modified_keys()
 
@@ -276,28 +498,16 @@ def _run_tui() -> None:
             else:
                 buf.insert_text("\n")
 
-    # Newline on Ctrl-J
-    @kb.add("c-j")
-    def _(event):
+    def _insert_newline(event):
         event.current_buffer.insert_text("\n")
 
-    # Best-effort Shift+Enter (and variants) for newline. Terminals differ in naming.
-    for key_name in ("s-enter", "s-return"):
-        try:
-            @kb.add(key_name)
-            def _(event):
-                event.current_buffer.insert_text("\n")
-        except Exception:
-            pass
-
-    # Optional Alt+Enter and Ctrl+Enter newline fallbacks
-    for key_name in ("a-enter", "c-enter", "a-return", "c-return"):
-        try:
-            @kb.add(key_name)
-            def _(event):
-                event.current_buffer.insert_text("\n")
-        except Exception:
-            pass
+    # Newline on Ctrl-J, plus best-effort Shift/Alt/Ctrl+Enter variants.
+    # Terminals and prompt_toolkit versions differ in naming, so register
+    # only the names this version knows instead of trying each one.
+    known_keys = set(ALL_KEYS) | set(KEY_ALIASES)
+    for key_name in ("c-j", "s-enter", "s-return", "a-enter", "c-enter", "a-return", "c-return"):
+        if key_name in known_keys:
+            kb.add(key_name)(_insert_newline)
 
     # Submit on Ctrl-S (handy on some keyboards)
     @kb.add("c-s")
@@ -319,17 +529,19 @@ def _run_tui() -> None:
     # No intro print; keep the interface clean.
     try:
         while True:
-            with patch_stdout():
-                try:
-                    text = session.prompt(
-                        bar_tokens,
-                        multiline=True,
-                        prompt_continuation=prompt_continuation,
-                        complete_while_typing=True,
-                        key_bindings=kb,
-                    )
-                except EOFError:
-                    break
+            # No patch_stdout(): replies stream only after prompt() returns and
+            # nothing else writes while it runs, so the stdout proxy (and its
+            # flush thread) would be set up and torn down each turn for nothing
+            try:
+                text = session.prompt(
+                    bar_tokens,
+                    multiline=True,
+                    prompt_continuation=prompt_continuation,
+                    complete_while_typing=True,
+                    key_bindings=kb,
+                )
+            except EOFError:
+                break
 
             if text is None:
                 break
@@ -352,16 +564,17 @@ def _run_tui() -> None:
                 print("[client] Usage: /enter send | /enter newline")
                 continue
 
-            # Print a horizontal rule before the response
-            width = shutil.get_terminal_size(fallback=(80, 20)).columns
-            print("-" * max(20, min(120, width)))
+            # Print a horizontal rule before the response. prompt() replaced
+            # our SIGWINCH handler, so catch up on resizes made at the prompt
+            # and track the ones made while the response streams.
+            _track_term_cols()
+            print(_rule())
 
             clean, attachments = _parse_file_commands(text)
-            message = _build_message(clean, attachments)
-            stream_once(message)
-            # Draw a trailing rule after the LLM response
-            width = shutil.get_terminal_size(fallback=(80, 20)).columns
-            print("-" * max(20, min(120, width)))
+            message = _build_message(clean, attachments) if attachments else clean
+            # Trailing rule goes out with the response's closing newline, built
+            # after streaming from the width the SIGWINCH handler keeps current
+            stream_once(message, footer=_rule)
     except KeyboardInterrupt:
         # Propagate to main for a clean process exit code.
         raise
@@ -0,0 +1,69 @@
+"""Tests for the client's streamed Markdown rendering.
+
+Run from this directory with: python -m pytest test_client.py
+"""
+
+import io
+
+import pytest
+from rich.console import Console
+from rich.markdown import Markdown
+
+from client import _MarkdownStream
+
+
+DOCUMENTS = {
+    "fence_in_list_item": (
+        "Steps:\n\n"
+        "1. Install it:\n\n"
+        "   ```bash\n"
+        "   pip install httpx\n"
+        "\n"
+        "   httpx --version\n"
+        "   ```\n\n"
+        "2. Run it.\n"
+    ),
+    "indented_continuation": (
+        "- first item\n\n"
+        "  continued paragraph of the first item\n\n"
+        "- second item\n"
+    ),
+    "loose_ordered_list": "1. a\n\n2. b",
+    "mixed": (
+        "# Title\n\n"
+        "Some *text* with `code`.\n\n"
+        "---\n"
+        "After the rule.\n\n"
+        "```python\n"
+        "def f():\n"
+        "\n"
+        "    return 1\n"
+        "```\n"
+        "> quoted\n"
+        "> lines\n\n"
+        "| a | b |\n"
+        "|---|---|\n"
+        "| 1 | 2 |\n\n"
+        "Setext heading\n"
+        "--------------\n"
+        "tail"
+    ),
+}
+
+
+def _render(renderable) -> str:
+    console = Console(file=io.StringIO(), width=80, color_system=None)
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+@pytest.mark.parametrize("name", sorted(DOCUMENTS))
+@pytest.mark.parametrize("step", [1, 3, 16, 10_000])
+def test_streamed_render_matches_whole_render(name, step):
+    text = DOCUMENTS[name]
+    md = _MarkdownStream()
+    for i in range(0, len(text), step):
+        md.feed(text[i:i + step])
+        # Simulate a Live refresh between chunks
+        _render(md)
+    assert _render(md) == _render(Markdown(text))
@@ -5,7 +5,8 @@ Search-first policy when needed and shell for file/code operations.
 
 from __future__ import annotations
 
-from typing import Annotated, List, Literal, TypedDict
+from functools import lru_cache
+from typing import Annotated, List, Literal, Tuple, TypedDict
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
@@ -72,6 +73,18 @@ def _make_initial_plan(goal: str, needs_search: bool) -> List[str]:
     return plan
 
 
+@lru_cache(maxsize=64)
+def _system_message(goal: str, plan: Tuple[str, ...]) -> SystemMessage:
+    # Policy + plan prefix; identical for every agent turn within a goal
+    plan_txt = "\n".join(f"- {s}" for s in plan)
+    return SystemMessage(
+        content=(
+            f"{SYSTEM_PROMPT}\n\nCurrent goal: {goal}\n"
+            f"Planned steps:\n{plan_txt if plan_txt else '- (none)'}\n"
+        )
+    )
+
+
 def build_reasoning_graph(llm: ChatOpenAI):
     tools = get_tools()
     llm_with_tools = llm.bind_tools(tools)
@@ -98,14 +111,8 @@ def build_reasoning_graph(llm: ChatOpenAI):
         messages = state["messages"]
         # Ensure a single system message at the start encapsulating policy and current plan
         if not any(isinstance(m, SystemMessage) for m in messages):
-            plan_txt = "\n".join(f"- {s}" for s in state.get("plan", []))
-            sys = SystemMessage(
-                content=(
-                    f"{SYSTEM_PROMPT}\n\nCurrent goal: {state.get('goal','')}\n"
-                    f"Planned steps:\n{plan_txt if plan_txt else '- (none)'}\n"
-                )
-            )
-            messages = [sys] + messages
+            sys = _system_message(state.get("goal", ""), tuple(state.get("plan", [])))
+            messages = [sys, *messages]
 
         response = llm_with_tools.invoke(messages)
         return {"messages": [response]}